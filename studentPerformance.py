@@ -9,34 +9,33 @@ Usage:
 Run from menu.ipynb with a database path, student ID and test name.
 
 """
-import sqlite3
 import pandas as pd
 import matplotlib.pyplot as plt
+from tableCache import load_table, question_columns
 
-# 1. Connect to database and load the selected assessment table
+# 1. Load the selected assessment table (cached between calls)
 def student_performance(db_path, student_id, test_name):
     """Analyse and visualise a student's performance for a given test."""
 
-    conn = sqlite3.connect(db_path)
-
-    df_test = pd.read_sql_query(
-        f"SELECT * FROM {test_name}",
-        conn
-    )
+    df_test = load_table(db_path, test_name)
 
     # 2. Locate the target student record and validate student_id
     df_student = df_test[df_test['research_id'] == student_id]
 
     if df_student.empty:
         print("Student ID not found in this test.")
-        conn.close()
         return
     
     # 3. Detect question columns (Q1, Q2, ...) and compute absolute/relative scores
-    question_cols = [col for col in df_test.columns if col.startswith('Q')]
+    question_cols = question_columns(df_test.columns)
 
     absolute_scores = df_student[question_cols].iloc[0]
-    average_scores = df_test[question_cols].mean()
+    # Question averages are precomputed by CWPreprocessor.run; fall back to
+    # scanning the table for databases built before the {test}_Means tables.
+    try:
+        average_scores = load_table(db_path, f"{test_name}_Means")[question_cols].iloc[0]
+    except (pd.errors.DatabaseError, KeyError):
+        average_scores = df_test[question_cols].mean()
     relative_scores = absolute_scores - average_scores
 
     # 4. Visualise absolute performance
@@ -60,8 +59,5 @@ def student_performance(db_path, student_id, test_name):
     plt.tight_layout()
     plt.show()
 
-    # 6. Close database connection
-    conn.close()
-
 if __name__ == "__main__":
     print("Run this module from menu.ipynb.")
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+tableCache.py
+------------------------------------------------------------
+Purpose:
+Load assessment tables from the SQLite database once and reuse
+them across analysis calls until the database file changes, and
+define the question-column naming rule shared with preprocessing.
+
+Usage:
+Imported by the analysis modules and CWPreprocessing; not run directly.
+
+"""
+import os
+import re
+import sqlite3
+from functools import lru_cache
+import pandas as pd
+
+# Question columns after renaming (Q1, Q2, ...). Used for the stored
+# <Test>_Means tables and for the per-question plots, so they always agree.
+QUESTION_COL = re.compile(r"Q(\d+)")
+
+
+def question_columns(columns):
+    """Return question columns (Q1, Q2, ...) in numeric order."""
+    matches = [QUESTION_COL.fullmatch(str(c)) for c in columns]
+    return [m.group(0) for m in sorted(filter(None, matches), key=lambda m: int(m.group(1)))]
+
+
+@lru_cache(maxsize=32)
+def _load_table(db_path, table_name, mtime):
+    """Read a whole table. mtime is only part of the cache key."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+    finally:
+        conn.close()
+
+
+def load_table(db_path, table_name):
+    """
+    Return table_name as a DataFrame, cached until the database file is
+    rewritten. The frame is shared between callers, so do not modify it.
+    """
+    return _load_table(db_path, table_name, os.path.getmtime(db_path))
+
+
+if __name__ == "__main__":
+    print("Run this module from menu.ipynb.")
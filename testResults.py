@@ -26,28 +26,29 @@ def fetch_all_results(db_path, student_id):
         conn
     )["name"].tolist()
 
-    results = []
-    for t in tables:
-        if t not in ["Test_1", "Test_2", "Test_3", "Test_4", "Mock_Test", "Sum_Test"]:
-            continue
-
-        df = pd.read_sql_query(
-            f"SELECT research_id, Grade FROM {t} WHERE research_id = ?",
-            conn,
-            params=(student_id,)
+    # 3) Look the student up in every assessment with one indexed query
+    assessments = [
+        t for t in tables
+        if t in ["Test_1", "Test_2", "Test_3", "Test_4", "Mock_Test", "Sum_Test"]
+    ]
+    results = pd.DataFrame(columns=["Assessment", "Grade"])
+    if assessments:
+        sql = " UNION ALL ".join(
+            f"SELECT '{t}' AS Assessment, Grade FROM {t} WHERE research_id = ?"
+            for t in assessments
         )
-        if len(df) > 0:
-            results.append({"Assessment": t, "Grade": float(df.loc[0, "Grade"])})
-    # 3) Close database connection
+        results = pd.read_sql_query(sql, conn, params=(student_id,) * len(assessments))
+        results = results.drop_duplicates(subset=["Assessment"])
+
     conn.close()
 
     # 4) Handle case where student has no results
-    if not results:
+    if results.empty:
         print("No results found for student:", student_id)
         return
     
     # 6) Display results table
-    df_out = pd.DataFrame(results).sort_values("Assessment")
+    df_out = results.astype({"Grade": float}).sort_values("Assessment")
     print(df_out.to_string(index=False))
 
     # 7) Visualise results
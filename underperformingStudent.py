@@ -9,36 +9,39 @@ Usage:
 Run from menu.ipynb with a database path.
 
 """
-import sqlite3
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from tableCache import load_table
 
 
 def find_underperforming_students(db_path):
-    conn = sqlite3.connect(db_path)
-
     # 1) Summative table
-    df_sum = pd.read_sql_query("SELECT research_id, Grade FROM Sum_Test", conn)
+    df_sum = load_table(db_path, "Sum_Test")[["research_id", "Grade"]]
     df_sum = df_sum.dropna(subset=["research_id", "Grade"]).copy()
 
-    # 2) Formative tables (include Mock_Test as stated)
+    # 2) Formative tables (include Mock_Test as stated).
+    #    Grade > 0 counts as an attempt, so non-attempts are dropped once here.
+    #    Tables are stacked alphabetically so ties in step 4 resolve by test name.
     formative_tables = ["Test_1", "Test_2", "Test_3", "Test_4", "Mock_Test"]
     formative_results = []
 
-    for table in formative_tables:
-        df = pd.read_sql_query(f"SELECT research_id, Grade FROM {table}", conn)
-        df["Test"] = table
+    # Test is categorical, so the concat stores one small code per row
+    test_names = sorted(formative_tables)
+    for code, table in enumerate(test_names):
+        df = load_table(db_path, table)
+        df = df.loc[df["Grade"] > 0, ["research_id", "Grade"]]
+        codes = np.full(len(df), code, dtype=np.int8)
+        df = df.assign(Test=pd.Categorical.from_codes(codes, categories=test_names))
         formative_results.append(df)
 
     df_formative = pd.concat(formative_results, ignore_index=True)
-    df_formative = df_formative.dropna(subset=["research_id", "Grade"]).copy()
 
-    # 3) Grade > 0 counts as an attempt
-    df_attempts = df_formative[df_formative["Grade"] > 0].groupby("research_id").size().reset_index(name="Attempts")
+    # 3) Attempts per student
+    df_attempts = df_formative.groupby("research_id").size().reset_index(name="Attempts")
 
     # 4) Lowest formative grade
-    df_attended = df_formative[df_formative["Grade"] > 0].copy()
-    df_low = df_attended.sort_values(["research_id", "Grade", "Test"]).groupby("research_id").first().reset_index()
+    df_low = df_formative.loc[df_formative.groupby("research_id")["Grade"].idxmin()]
     df_low = df_low.rename(columns={"Grade": "Lowest_Formative_Grade", "Test": "Lowest_Formative_Test"})
 
     # 5) Underperforming definition
@@ -57,7 +60,6 @@ def find_underperforming_students(db_path):
 
     if df_result.empty:
         print("No underperforming students found (after inactive filter).")
-        conn.close()
         return
 
     # 8) Display results
@@ -67,12 +69,12 @@ def find_underperforming_students(db_path):
     # 9) Visualisation
     plt.figure(figsize=(14, 6))
 
-    x = list(range(len(df_result)))
-    summ = df_result["Summative_Grade"]
-    lowf = df_result["Lowest_Formative_Grade"].fillna(0)
+    x = np.arange(len(df_result))
+    summ = df_result["Summative_Grade"].to_numpy()
+    lowf = df_result["Lowest_Formative_Grade"].fillna(0).to_numpy()
 
-    plt.bar([i - 0.2 for i in x], summ, width=0.4, label="Summative Grade")
-    plt.bar([i + 0.2 for i in x], lowf, width=0.4, label="Lowest Formative Grade", alpha=0.7)
+    plt.bar(x - 0.2, summ, width=0.4, label="Summative Grade")
+    plt.bar(x + 0.2, lowf, width=0.4, label="Lowest Formative Grade", alpha=0.7)
 
     labels = df_result["research_id"].astype(str).tolist()
     step = max(1, len(labels) // 10)
@@ -85,6 +87,5 @@ def find_underperforming_students(db_path):
     plt.tight_layout()
     plt.show()
 
-    conn.close()
 if __name__ == "__main__":
     print("Run this module from menu.ipynb.")
\ No newline at end of file